@@ -1,19 +1,42 @@
-from typing import Dict, List, Optional
-from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import repeat
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
 import re
+import sys
 import shutil
+import hashlib
+import json
 import uuid
 import subprocess
+import threading
 import datetime as dt
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 import pandas as pd
 import jira
 from requests.exceptions import InvalidURL
 
-REPO_URL_REGEX = re.compile(r"https://github\.com/[A-Za-z0-9\-\_]+/[A-Za-z0-9\-\_]+")
-JIRA_URL_REGEX = re.compile(r"https://[A-Za-z0-9\-\_]+\.atlassian\.net")
+REPO_URL_REGEX = re.compile(r"https://github\.com/[\w\-]+/[\w\-]+", re.ASCII)
+JIRA_URL_REGEX = re.compile(r"https://[\w\-]+\.atlassian\.net", re.ASCII)
 BENCHMARK_OUTPUT_REGEX = re.compile(r"(Tests:\s\d+/\d+\svalid\nMark:\s\s(\d+)/(\d+)\spoints)\n\n$")
-BENCHMARK_TEST_REGEX = re.compile(r"(92m|91m)Test\s(\d\d\d)\x1b\[0m:\s([^\n]+?)\s\[\d\d?\spoints?\]")
+BENCHMARK_OUTPUT_MAX_LENGTH = 200 # the 'Tests/Mark' section is at the very end of the benchmark output
+BENCHMARK_TEST_REGEX = re.compile(
+    r"(?P<color>92m|91m)Test\s(?P<test_nr>\d\d\d)\x1b\[0m:\s(?P<test_name>[^\n]+?)\s\[\d\d?\spoints?\]"
+)
+JIRA_PAGE_SIZE = 500 # the server may return fewer issues per page (Jira Cloud: at most 100)
+JIRA_REQUEST_SLOTS = threading.BoundedSemaphore(10) # limit parallel JIRA requests to avoid rate limiting (HTTP 429)
+LECTURERS = frozenset({'Oliver Staubli', 'samhab'}) # commits of these authors are not counted
+BENCHMARK_GAMES = ['hangman', 'battleship', 'uno', 'dog']
+MAIN_TABLE_COLUMNS = [
+    "team_id", "team_name", "repository", "contributors", "github_errors", "jira_board", "completed_jira_issues",
+    *[f"{game}_benchmark" for game in BENCHMARK_GAMES],
+    *[f"{game}_score" for game in BENCHMARK_GAMES],
+]
+BENCHMARK_TIMEOUTS_FILE = 'benchmark_timeouts.json'
+BENCHMARK_SLOTS = threading.BoundedSemaphore(os.cpu_count() or 1) # limit parallel benchmarks over all teams
 
 @dataclass
 class Team:
@@ -24,148 +47,226 @@ class Team:
     jira_board: Optional[str]
 
 
-def strip_repo_url(repo_url: str) -> str:
-    match = REPO_URL_REGEX.search(repo_url)
-    if match:
-        return match.group(0)
-    return repo_url
-
-
-def strip_jira_url(jira_url: str) -> str:
-    match = JIRA_URL_REGEX.search(jira_url)
-    if match:
-        return match.group(0)
-    return jira_url
+def strip_urls(urls: pd.Series, url_regex: re.Pattern) -> pd.Series:
+    """ Strip each url to the part matching url_regex at its start. Urls not matching are kept as they are """
+    urls = urls.astype('string')
+    return urls.str.extract(rf"^\s*({url_regex.pattern})", flags=url_regex.flags, expand=False).fillna(urls)
 
 
 def read_team_spreadsheet(sheet_url: str) -> List[Team]:
     csv_export_url = sheet_url.replace("/edit?gid=", "/export?format=csv&gid=")
-    dataframe = pd.read_csv(csv_export_url, header=1, skiprows=0)
-    result = []
-    for _, team_row in dataframe[~dataframe['Team Nr'].isna()].iterrows():
-        repo_url = strip_repo_url(team_row['GitHub Repo URL']) if not pd.isna(team_row['GitHub Repo URL']) else None
-        jira_url = strip_jira_url(team_row['Jira Board URL']) if not pd.isna(team_row['Jira Board URL']) else None
-        result.append(Team(
+    dataframe = pd.read_csv(
+        csv_export_url,
+        header=1,
+        skiprows=0,
+        usecols=['Team Nr', 'Team Name', 'GitHub Repo URL', 'Jira Board URL']
+        )
+    team_rows = pd.DataFrame({
+        'nr': dataframe['Team Nr'],
+        'name': dataframe['Team Name'],
+        'repository': strip_urls(dataframe['GitHub Repo URL'], REPO_URL_REGEX),
+        'jira_board': strip_urls(dataframe['Jira Board URL'], JIRA_URL_REGEX),
+    })
+    team_rows = team_rows.astype(object).where(team_rows.notna(), None)
+    return [
+        Team(
             id=str(uuid.uuid4()),
-            nr=team_row['Team Nr'] if not pd.isna(team_row['Team Nr']) else None,
-            name=team_row['Team Name'] if not pd.isna(team_row['Team Name']) else None,
-            repository=repo_url,
-            jira_board=jira_url
-            ))
-    return result
+            nr=team_row.nr,
+            name=team_row.name,
+            repository=team_row.repository,
+            jira_board=team_row.jira_board
+            )
+        for team_row in team_rows.itertuples(index=False) if team_row.nr is not None
+    ]
 
 
 class CloneRepoError(Exception):
     pass
 
 
-def clone_repo(repo_url: str, clone_dir: str) -> None:
-    """ Clone repository to clone_dir. If directory exists, it needs to be empty """
-    if not os.path.exists(clone_dir):
-        os.makedirs(clone_dir)
-    wd = os.getcwd()
-    os.chdir(clone_dir)
+def git_quiet_flag() -> list[str]:
+    """ Suppress progress output of git commands unless env variable 'VERBOSE' is set. Errors are still printed """
+    return [] if os.getenv('VERBOSE') else ["--quiet"]
+
+
+def clone_repo(repo_url: str, clone_dir: str, depth: Optional[int] = None) -> None:
+    """
+    Clone repository to clone_dir. If directory exists, it needs to be empty
+    Without depth, the history is cloned completely but blobs are only fetched when needed by a checkout
+    ('partial clone') and no working tree is checked out, the caller checks out the commit it needs.
+    With depth, only the last 'depth' commits are cloned and checked out ('shallow clone')
+    """
+    history_flags = ["--filter=blob:none", "--no-checkout"] if depth is None else [f"--depth={depth}"]
     try:
-        subprocess.run(["git", "clone", repo_url, clone_dir], check=True)
+        subprocess.run(
+            ["git", "clone", *git_quiet_flag(), *history_flags, "--no-tags", repo_url, clone_dir],
+            check=True
+        )
     except subprocess.CalledProcessError as err:
-        os.chdir(wd)
         raise CloneRepoError(err) from err
-    os.chdir(wd)
 
 
-def checkout_last_valid_commit(repo_dir: str, deadline: str) -> None:
-    wd = os.getcwd()
-    os.chdir(repo_dir)
-    commit_info = subprocess.run(
-        ["git", "log", f"--before={deadline}", "-1", "--format=%h;%ad"],
-        capture_output=True,
-        text=True,
-        check=True
-        ).stdout.strip()
-    commit_id, commit_date = commit_info.split(';')
-    num_commits_after_deadline = subprocess.run(
-        f"git log --after='{deadline}' --oneline | wc -l",
-        capture_output=True,
-        text=True,
-        check=True,
-        shell=True
-    ).stdout.strip()
-    print(f"Checkout commit '{commit_id}' of {commit_date} ({num_commits_after_deadline} commits behind HEAD)")
-    subprocess.run(
-        ["git", "checkout", commit_id],
-        capture_output=True,
-        check=True
-    )
-    os.chdir(wd)
+def update_repo(repo_dir: str) -> None:
+    """ Reset an existing clone in repo_dir to the latest commit of its remote """
+    try:
+        subprocess.run(["git", "fetch", *git_quiet_flag(), "--depth=1", "origin", "HEAD"], cwd=repo_dir, check=True)
+        subprocess.run(["git", "reset", *git_quiet_flag(), "--hard", "FETCH_HEAD"], cwd=repo_dir, check=True)
+    except subprocess.CalledProcessError as err:
+        raise CloneRepoError(err) from err
+
+
+def get_head_commit(repo_dir: str) -> str:
+    """ Full commit id of the commit checked out in repo_dir """
+    try:
+        result = subprocess.run(["git", "rev-parse", "HEAD"], cwd=repo_dir, capture_output=True, text=True, check=True)
+    except subprocess.CalledProcessError as err:
+        raise CloneRepoError(err) from err
+    return result.stdout.strip()
+
+
+def parse_deadline(deadline: str) -> dt.datetime:
+    """ Parse an ISO formatted deadline, optionally followed by a time zone name (e.g. '2024-12-21 00:00 CET') """
+    date_part, _, tz_name = deadline.rpartition(' ')
+    try:
+        return dt.datetime.fromisoformat(date_part).replace(tzinfo=ZoneInfo(tz_name))
+    except (ValueError, ZoneInfoNotFoundError):
+        pass
+    parsed = dt.datetime.fromisoformat(deadline)
+    return parsed if parsed.tzinfo else parsed.astimezone()
+
+
+def get_deadline() -> dt.datetime:
+    """ Deadline for the team repos from env variable 'DEADLINE' (see 'parse_deadline'), default: now """
+    deadline = os.getenv('DEADLINE')
+    if deadline is None:
+        return dt.datetime.now().astimezone()
+    try:
+        return parse_deadline(deadline)
+    except ValueError as err:
+        raise ValueError(
+            f"Invalid DEADLINE '{deadline}', expected ISO format with optional time zone (e.g. '2024-12-21 00:00 CET')"
+        ) from err
+
+
+def checkout_last_valid_commit(repo_dir: str, deadline: dt.datetime) -> str:
+    """ Checkout the latest commit committed before the deadline. Return the full commit id """
+    with subprocess.Popen(
+        ["git", "log", "--format=%H;%ad;%cI"],
+        cwd=repo_dir,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True
+        ) as git_log:
+        assert git_log.stdout is not None and git_log.stderr is not None # always set with PIPE
+        for num_commits_after_deadline, commit_info in enumerate(git_log.stdout):
+            commit_id, commit_date, committer_date = commit_info.rstrip('\n').split(';')
+            if dt.datetime.fromisoformat(committer_date) <= deadline:
+                break
+        else:
+            if git_log.wait() != 0:
+                raise CloneRepoError(f"git log failed: {' '.join(git_log.stderr.read().split())}")
+            raise CloneRepoError(f"No commit before deadline '{deadline}'")
+        git_log.terminate() # the remaining (older) history is not needed
+    print(f"Checkout commit '{commit_id[:7]}' of {commit_date} ({num_commits_after_deadline} commits behind HEAD)")
+    try:
+        # the clone has no blobs yet (see 'clone_repo'), the checkout fetches them from the remote
+        subprocess.run(
+            ["git", "checkout", commit_id],
+            cwd=repo_dir,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+            check=True
+        )
+    except subprocess.CalledProcessError as err:
+        raise CloneRepoError(f"Checkout of commit '{commit_id[:7]}' failed: {' '.join(err.stderr.split())}") from err
+    return commit_id
 
 
 def evaluate_commit_hist(repo_dir: str) -> Dict[str, int]:
-    """ Get number of commits by user. Return dict with user: num_commits """
-    wd = os.getcwd()
-    os.chdir(repo_dir)
+    """ Get number of commits by user, excluding the lecturers (see LECTURERS). Return dict with user: num_commits """
     result = subprocess.run(
-        "git log --pretty=short | git shortlog -n -s",
+        ["git", "log", "--format=%aN"],
+        cwd=repo_dir,
         capture_output=True,
         text=True,
-        check=True,
-        shell=True
+        check=True
     )
-    os.chdir(wd)
-    out = {}
-    for statement in result.stdout.strip().split('\n'):
-        parts = statement.strip().split("\t")
-        if len(parts) == 2:
-            out[parts[1].strip()] = int(parts[0].strip())
-    return out
-
-
-def remove_lecturer_contributions(contributors: Dict[str, int]) -> None:
-    if 'Oliver Staubli' in contributors:
-        del contributors['Oliver Staubli']
-    if 'samhab' in contributors:
-        del contributors['samhab']
+    return dict(Counter(user for user in result.stdout.splitlines() if user not in LECTURERS).most_common())
 
 
 class JiraEvalError(Exception):
     pass
 
 
-def evaluate_jira_issues(jira_board: str) -> dict[str, int]:
-    """ Get the number of JIRA issues with status 'Done' by 'assignee'. Return dict with user: num_issues """
+def fetch_jira_page(j_client: jira.JIRA, jql_query: str, start_at: int) -> dict[str, Any]:
+    """ Fetch one page of issues matching jql_query, restricted to the 'assignee' field. Return the raw json result """
     try:
-        j_client = jira.JIRA(
-            server=jira_board,
-            basic_auth=(os.environ["JIRA_EMAIL"], os.environ["JIRA_API_TOKEN"])
-        )
-        j_client.current_user()
+        with JIRA_REQUEST_SLOTS:
+            page = j_client.search_issues(
+                jql_query,
+                startAt=start_at,
+                maxResults=JIRA_PAGE_SIZE,
+                fields="assignee",
+                json_result=True
+            )
+    except jira.JIRAError as error:
+        raise JiraEvalError("Jira Query issue: " + error.text) from error
+    if not isinstance(page, dict): # according to mypy the search result is of type 'ResultList | dict'
+        raise JiraEvalError("Jira Query issue: unexpected search result")
+    return page
+
+
+@lru_cache(maxsize=8)
+def get_jira_client(jira_board: str) -> jira.JIRA:
+    """ Create an authenticated JIRA client. Clients are reused for teams sharing the same JIRA instance """
+    try:
+        with JIRA_REQUEST_SLOTS:
+            j_client = jira.JIRA(
+                server=jira_board,
+                basic_auth=(os.environ["JIRA_EMAIL"], os.environ["JIRA_API_TOKEN"])
+            )
+            j_client.current_user()
     except KeyError as error:
         raise JiraEvalError("Please provide env variables 'JIRA_EMAIL' and 'JIRA_API_TOKEN'") from error
     except InvalidURL as error:
         raise JiraEvalError('Invalid JIRA board url') from error
     except jira.JIRAError as error:
         raise JiraEvalError('JIRA authentication failed: ' + error.text) from error
-    try:
-        jql_query = "statusCategory = Done ORDER BY created DESC"
-        issues = j_client.search_issues(jql_query, maxResults=False)
-    except jira.JIRAError as error:
-        raise JiraEvalError("Jira Query issue: " + error.text) from error
-    assignees: dict[str, int] = {}
-    for issue in issues:
-        if isinstance(issue, str): # according to mypy the issues from search are of type 'issue | str'
-            continue
-        assignee = issue.get_field('assignee')
-        if assignee:
-            if assignee.displayName in assignees:
-                assignees[assignee.displayName] += 1
-            else:
-                assignees[assignee.displayName] = 1
-    return assignees
+    return j_client
+
+
+def evaluate_jira_issues(jira_board: str) -> dict[str, int]:
+    """ Get the number of JIRA issues with status 'Done' by 'assignee'. Return dict with user: num_issues """
+    j_client = get_jira_client(jira_board)
+    jql_query = "statusCategory = Done ORDER BY created DESC"
+    first_page = fetch_jira_page(j_client, jql_query, 0)
+    pages = [first_page]
+    # the first page tells the total and the page size granted by the server, fetch the remaining pages in parallel
+    page_size = len(first_page['issues'])
+    if page_size > 0:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            pages.extend(executor.map(
+                fetch_jira_page,
+                repeat(j_client),
+                repeat(jql_query),
+                range(page_size, first_page['total'], page_size)
+            ))
+    assignees = Counter(
+        issue['fields']['assignee']['displayName']
+        for page in pages for issue in page['issues'] if issue['fields'].get('assignee')
+    )
+    return dict(assignees)
 
 
 class RunBenchmarkError(Exception):
     pass
 
 
+class BenchmarkTimeoutError(RunBenchmarkError):
+    pass
+
+
 @dataclass
 class TestResult:
     test_nr: int
@@ -178,36 +279,53 @@ class BenchmarkResult:
     overall_results: str
     percentage: float
     test_results: list[TestResult]
-
-
-def run_benchmark(repo_dir: str, game: str, timeout: int = 120) -> BenchmarkResult:
-    wd = os.getcwd()
-    os.chdir(repo_dir)
+    timed_out: bool = False
+
+
+def benchmark_env(repo_dir: str, venv_dir: Optional[str] = None) -> dict[str, str]:
+    """ Environment for the benchmarks of repo_dir. If venv_dir is given, they use the python of this virtualenv """
+    env = {**os.environ, "PYTHONPATH": repo_dir}
+    if venv_dir is not None:
+        env["PATH"] = os.path.join(venv_dir, 'bin') + os.pathsep + env.get("PATH", "")
+    return env
+
+
+def run_benchmark(
+    repo_dir: str,
+    game: str,
+    timeout: int = 120,
+    env: Optional[dict[str, str]] = None
+    ) -> BenchmarkResult:
+    """ Run the benchmark of game with env (default: 'benchmark_env' of repo_dir) """
+    if env is None:
+        env = benchmark_env(repo_dir)
     try:
-        env = os.environ.copy()
-        env["PYTHONPATH"] = repo_dir
-        result = subprocess.run(
-            ["python", f"benchmark/benchmark_{game}.py", "python", f"{game}.{game.capitalize()}"],
-            capture_output=True,
-            text=True,
-            check=False,
-            shell=False,
-            timeout=timeout,
-            env=env
-        )
+        with BENCHMARK_SLOTS:
+            result = subprocess.run(
+                ["python", f"benchmark/benchmark_{game}.py", "python", f"{game}.{game.capitalize()}"],
+                cwd=repo_dir,
+                capture_output=True,
+                text=True,
+                check=False,
+                shell=False,
+                timeout=timeout,
+                env=env
+            )
     except subprocess.TimeoutExpired as err:
-        os.chdir(wd)
-        raise RunBenchmarkError("Timeout") from err
-    os.chdir(wd)
+        raise BenchmarkTimeoutError("Timeout") from err
     if result.returncode != 0:
         raise RunBenchmarkError("Benchmark evaluation failed with message: " + result.stderr)
-    overall_score = BENCHMARK_OUTPUT_REGEX.search(result.stdout)
+    overall_score = BENCHMARK_OUTPUT_REGEX.search(result.stdout[-BENCHMARK_OUTPUT_MAX_LENGTH:])
     if not overall_score:
         raise RunBenchmarkError("No proper Benchmark output (missing 'Tests/Mark' section)")
-    test_scores = BENCHMARK_TEST_REGEX.findall(result.stdout)
-    test_results = []
-    for test in test_scores:
-        test_results.append(TestResult(test_nr=int(test[1]), test_name=test[2], passed=test[0] == '92m'))
+    test_results = [
+        TestResult(
+            test_nr=int(test.group('test_nr')),
+            test_name=test.group('test_name'),
+            passed=test.group('color') == '92m'
+            )
+        for test in BENCHMARK_TEST_REGEX.finditer(result.stdout)
+    ]
     return BenchmarkResult(
         overall_results=overall_score.group(1),
         percentage=float(overall_score.group(2))/float(overall_score.group(3)),
@@ -215,131 +333,364 @@ def run_benchmark(repo_dir: str, game: str, timeout: int = 120) -> BenchmarkResu
         )
 
 
+def benchmark_cache_dir(temp_dir: str) -> str:
+    """ Directory for data kept between runs. Configurable with env variable 'BENCHMARK_CACHE', default: temp_dir """
+    return os.getenv('BENCHMARK_CACHE', temp_dir)
+
+
+def benchmark_venv_dir(benchmark_repo_dir: str) -> str:
+    """ Virtualenv with the requirements of the benchmark-repo, the benchmarks are run with its python """
+    return os.path.join(benchmark_repo_dir, '.venv')
+
+
 def prepare_benchmark_evaluation(
     temp_dir: str,
     benchmark_repo_url: str = "https://github.com/ostaubli/devops_project"
     ) -> str:
-    """ Clone the benchmark-repo and install requirements according to the 'requirements.txt'. Return repo path """
-    repo_dir = os.path.join(temp_dir, 'master_repo')
-    clone_repo(benchmark_repo_url, repo_dir)
-    subprocess.run(["pip", "install", "-r", f"{repo_dir}/requirements.txt"], check=True)
+    """
+    Clone the benchmark-repo and install requirements according to the 'requirements.txt'. Return repo path
+    The clone is kept in 'BENCHMARK_CACHE' (default: temp_dir) and only updated on subsequent runs,
+    the requirements are installed into a virtualenv (see 'benchmark_venv_dir') and only again if they changed
+    """
+    repo_dir = os.path.join(benchmark_cache_dir(temp_dir), 'master_repo')
+    if os.path.exists(repo_dir):
+        update_repo(repo_dir)
+    else:
+        clone_repo(benchmark_repo_url, repo_dir, depth=1)
+    requirements_file = os.path.join(repo_dir, 'requirements.txt')
+    with open(requirements_file, 'rb') as file:
+        # include the python version, a cached venv of another interpreter needs to be set up again
+        requirements_hash = hashlib.sha256(file.read() + sys.version.encode()).hexdigest()
+    venv_dir = benchmark_venv_dir(repo_dir)
+    sentinel_file = os.path.join(venv_dir, '.requirements.sha')
+    if os.path.exists(sentinel_file):
+        with open(sentinel_file, encoding='utf-8') as file:
+            if file.read() == requirements_hash:
+                return repo_dir
+    subprocess.run([sys.executable, "-m", "venv", venv_dir], check=True)
+    if shutil.which("uv"):
+        # uv resolves and downloads in parallel, it is much faster than pip
+        install_cmd = ["uv", "pip", "install", "--python", os.path.join(venv_dir, 'bin', 'python')]
+    else:
+        install_cmd = [os.path.join(venv_dir, 'bin', 'pip'), "install", "--disable-pip-version-check", "--no-input"]
+    subprocess.run([*install_cmd, "-r", requirements_file], check=True)
+    with open(sentinel_file, 'w', encoding='utf-8') as file:
+        file.write(requirements_hash)
     return repo_dir
 
 
-def run_all_benchmarks(repo_dir: str, benchmark_repo_dir: str) -> dict[str, BenchmarkResult]:
+def remove_path(path: str) -> None:
+    """ Remove the file, symlink or directory tree at path if it exists """
+    if os.path.islink(path) or os.path.isfile(path):
+        os.remove(path)
+    elif os.path.isdir(path):
+        shutil.rmtree(path)
+
+
+def link_or_copy(src: str, dst: str) -> None:
+    """ Hardlink src to dst, fall back to a copy if linking is not possible (e.g. across devices) """
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def run_all_benchmarks(
+    repo_dir: str,
+    benchmark_repo_dir: str,
+    skip_games: Optional[set[str]] = None
+    ) -> dict[str, BenchmarkResult]:
     """
     Replace the benchmark files in 'repo_dir' with the files from 'benchmark_repo_dir' and evaluate
+    The games in 'skip_games' are not run but reported as timed out (see 'load_benchmark_timeouts')
     Returns dict with 'game': benchmark results
     """
-    if os.path.exists(os.path.join(repo_dir, 'benchmark')):
-        shutil.rmtree(os.path.join(repo_dir, 'benchmark'))
-    shutil.copytree(os.path.join(benchmark_repo_dir, 'benchmark'), os.path.join(repo_dir, 'benchmark'))
-    shutil.copy(os.path.join(benchmark_repo_dir, 'mypy.ini'), repo_dir)
-    shutil.copy(os.path.join(benchmark_repo_dir, '.pylintrc'), repo_dir)
+    remove_path(os.path.join(repo_dir, 'benchmark'))
+    # a tree of hardlinks and not a symlink: the benchmarks resolve their paths (e.g. sys.path) within the team repo
+    shutil.copytree(
+        os.path.join(benchmark_repo_dir, 'benchmark'),
+        os.path.join(repo_dir, 'benchmark'),
+        copy_function=link_or_copy
+    )
+    for config_file in ['mypy.ini', '.pylintrc']:
+        remove_path(os.path.join(repo_dir, config_file))
+        link_or_copy(os.path.join(benchmark_repo_dir, config_file), os.path.join(repo_dir, config_file))
     out: dict[str, BenchmarkResult] = {}
-    for game in ['hangman', 'battleship', 'uno', 'dog']:
-        try:
-            out[game] = run_benchmark(repo_dir, game)
-        except RunBenchmarkError as err:
-            out[game] = BenchmarkResult(overall_results=str(err), percentage=0, test_results=[])
+    for game in skip_games or set():
+        out[game] = BenchmarkResult(
+            overall_results="Skipped (timeout in previous run)", percentage=0, test_results=[], timed_out=True
+        )
+    env = benchmark_env(repo_dir, benchmark_venv_dir(benchmark_repo_dir))
+    with ThreadPoolExecutor(max_workers=len(BENCHMARK_GAMES)) as executor:
+        futures = {
+            game: executor.submit(run_benchmark, repo_dir, game, env=env)
+            for game in BENCHMARK_GAMES if game not in out
+        }
+        for game, future in futures.items():
+            try:
+                out[game] = future.result()
+            except BenchmarkTimeoutError as err:
+                out[game] = BenchmarkResult(overall_results=str(err), percentage=0, test_results=[], timed_out=True)
+            except RunBenchmarkError as err:
+                out[game] = BenchmarkResult(overall_results=str(err), percentage=0, test_results=[])
     return out
 
 
+def load_benchmark_timeouts(temp_dir: str) -> dict[str, dict[str, dict[str, str]]]:
+    """
+    Benchmarks which timed out in previous runs. Return dict with repository: {game: {'commit', 'benchmark'}},
+    the commit ids of the team repo and of the benchmark-repo the timeout occurred with
+    If env variable 'IGNORE_BENCHMARK_TIMEOUTS' is set, no timeouts are returned and the file is replaced in this run
+    """
+    timeouts_file = os.path.join(benchmark_cache_dir(temp_dir), BENCHMARK_TIMEOUTS_FILE)
+    if os.getenv('IGNORE_BENCHMARK_TIMEOUTS') or not os.path.exists(timeouts_file):
+        return {}
+    with open(timeouts_file, encoding='utf-8') as file:
+        timeouts = json.load(file)
+    # entries of the former {game: commit_id} layout are dropped
+    return {
+        repo: {game: entry for game, entry in games.items() if isinstance(entry, dict)}
+        for repo, games in timeouts.items()
+    }
+
+
+def recorded_timeouts(
+    timeouts: dict[str, dict[str, dict[str, str]]],
+    repository: str | None,
+    benchmark_commit: str
+    ) -> dict[str, str]:
+    """ Timeouts of the repository recorded with the benchmark-repo at benchmark_commit. Return {game: commit_id} """
+    return {
+        game: entry['commit'] for game, entry in timeouts.get(repository or '', {}).items()
+        if entry.get('benchmark') == benchmark_commit
+    }
+
+
+def save_benchmark_timeouts(temp_dir: str, timeouts: dict[str, dict[str, dict[str, str]]]) -> None:
+    with open(os.path.join(benchmark_cache_dir(temp_dir), BENCHMARK_TIMEOUTS_FILE), 'w', encoding='utf-8') as file:
+        json.dump(timeouts, file, indent=2)
+
+
 @dataclass
 class TeamResult:
     git_contributors: str | None
     github_errors: str
     completed_jira_issues: str | None
     benchmark_results: dict[str, BenchmarkResult]
+    benchmark_timeouts: dict[str, str] = field(default_factory=dict)
 
 
-def evaluate_team(team: Team, temp_dir: str, master_repo: str) -> TeamResult:
-    errors = "no errors"
-    benchmark_results = {}
+@dataclass
+class RepoCheckout:
+    commit_id: str | None
+    error: str | None
+
+
+def fetch_team_repo(team: Team, temp_dir: str, deadline: dt.datetime) -> RepoCheckout:
+    """ Clone the team repo and checkout the last commit before the deadline """
     if team.repository is None:
-        contributors = None
-        errors = "No repository url in spreadsheed"
-    else:
-        print(f"Check repository of team {team.name} ({team.repository})")
-        repo_dir = os.path.join(temp_dir, team.id)
-        try:
-            clone_repo(team.repository, repo_dir)
-            deadline = os.getenv('DEADLINE', dt.datetime.now().strftime("%Y-%m-%d %H:%M:%s"))
-            checkout_last_valid_commit(repo_dir, deadline=deadline)
-        except CloneRepoError as err:
-            contributors = None
-            errors = f"Error when cloning repo: {err}"
+        return RepoCheckout(commit_id=None, error="No repository url in spreadsheed")
+    print(f"Check repository of team {team.name} ({team.repository})")
+    try:
+        clone_repo(team.repository, os.path.join(temp_dir, team.id))
+        commit_id = checkout_last_valid_commit(os.path.join(temp_dir, team.id), deadline=deadline)
+    except CloneRepoError as err:
+        return RepoCheckout(commit_id=None, error=f"Error when cloning repo: {err}")
+    return RepoCheckout(commit_id=commit_id, error=None)
+
+
+def evaluate_team_repository(
+    team: Team,
+    temp_dir: str,
+    master_repo: str,
+    checkout: RepoCheckout,
+    prior_timeouts: dict[str, str]
+    ) -> tuple[str | None, str, dict[str, BenchmarkResult], dict[str, str]]:
+    """
+    Evaluate commit history and benchmarks of the team repo fetched by 'fetch_team_repo' and remove it afterwards
+    Benchmarks which timed out for the same commit in a previous run ('prior_timeouts') are skipped
+    Return contributors, errors, benchmark results and the timed out benchmarks as {game: commit_id}
+    """
+    repo_dir = os.path.join(temp_dir, team.id)
+    contributors = None
+    benchmark_results = {}
+    benchmark_timeouts = {}
+    try:
+        if checkout.commit_id is None:
+            errors = checkout.error or "no errors"
         else:
             eval_results = evaluate_commit_hist(repo_dir)
-            remove_lecturer_contributions(eval_results)
             contributors = ", ".join([f"{user} ({commits})" for user, commits in eval_results.items()])
-            benchmark_results = run_all_benchmarks(repo_dir, master_repo)
-        shutil.rmtree(repo_dir)
+            skip_games = {game for game, commit_id in prior_timeouts.items() if commit_id == checkout.commit_id}
+            benchmark_results = run_all_benchmarks(repo_dir, master_repo, skip_games)
+            benchmark_timeouts = {game: checkout.commit_id for game, res in benchmark_results.items() if res.timed_out}
+            errors = "no errors"
+    finally:
+        if os.path.exists(repo_dir):
+            shutil.rmtree(repo_dir)
+    return contributors, errors, benchmark_results, benchmark_timeouts
+
+
+def evaluate_team_jira(team: Team) -> str | None:
+    """ Evaluate the completed issues on the JIRA board of the team. Return issues by assignee or error message """
     if team.jira_board is None:
-        jira_eval_results = None
-    else:
-        try:
-            jira_res = evaluate_jira_issues(team.jira_board)
-            jira_eval_results = ", ".join([f"{user} ({issues})" for user, issues in jira_res.items()])
-        except JiraEvalError as error:
-            jira_eval_results = str(error)
+        return None
+    try:
+        jira_res = evaluate_jira_issues(team.jira_board)
+    except JiraEvalError as error:
+        return str(error)
+    return ", ".join([f"{user} ({issues})" for user, issues in jira_res.items()])
+
+
+def evaluate_team(
+    team: Team,
+    temp_dir: str,
+    master_repo: str,
+    checkout: RepoCheckout,
+    prior_timeouts: dict[str, str]
+    ) -> TeamResult:
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        # the JIRA board is independent of the repository, query it while the repository is evaluated
+        jira_future = executor.submit(evaluate_team_jira, team)
+        contributors, errors, benchmark_results, benchmark_timeouts = evaluate_team_repository(
+            team, temp_dir, master_repo, checkout, prior_timeouts
+        )
+        jira_eval_results = jira_future.result()
     return TeamResult(
         git_contributors=contributors,
         github_errors=errors,
         completed_jira_issues=jira_eval_results,
-        benchmark_results=benchmark_results
+        benchmark_results=benchmark_results,
+        benchmark_timeouts=benchmark_timeouts
     )
 
 
-def evaluate_teams(sheet_url: str, temp_dir: str) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
-    teams = read_team_spreadsheet(sheet_url)
-    master_repo = prepare_benchmark_evaluation(temp_dir=temp_dir)
-    main_table = []
-    uno_table = []
-    dog_table = []
+def append_test_results(table: dict[str, list[str | int | None]], team: Team, tests: list[TestResult]) -> None:
+    """ Append the test results of a team as row to the column-wise table. Tests missing for a team are set to None """
+    if len(tests) == 0:
+        return
+    num_rows = len(table["team_id"])
+    row: dict[str, str | int | None] = {"team_id": team.nr, "team_name": team.name}
+    for test in tests:
+        row[f"{test.test_nr}: {test.test_name}"] = 1 if test.passed else 0
+    for column, values in table.items():
+        values.append(row.pop(column, None))
+    for column, value in row.items():
+        table[column] = [None] * num_rows + [value]
+
+
+def get_concurrency(env_variable: str, default: int) -> int:
+    """ Number of parallel workers, configurable with the given env variable """
+    return int(os.getenv(env_variable, str(default)))
+
+
+def fetch_team_repos(teams: list[Team], temp_dir: str, deadline: dt.datetime) -> dict[str, RepoCheckout]:
+    """ Fetch the team repos, this is network bound and uses many threads ('CLONE_CONCURRENCY') """
+    checkouts: dict[str, RepoCheckout] = {}
+    with ThreadPoolExecutor(max_workers=get_concurrency('CLONE_CONCURRENCY', 16)) as executor:
+        fetch_futures = {executor.submit(fetch_team_repo, team, temp_dir, deadline): team for team in teams}
+        for fetch_future in as_completed(fetch_futures):
+            team = fetch_futures[fetch_future]
+            try:
+                checkouts[team.id] = fetch_future.result()
+            except Exception as err:  # pylint: disable=broad-exception-caught
+                checkouts[team.id] = RepoCheckout(commit_id=None, error=f"Error when cloning repo: {err}")
+    return checkouts
+
+
+def evaluate_fetched_teams(
+    teams: list[Team],
+    temp_dir: str,
+    master_repo: str,
+    checkouts: dict[str, RepoCheckout]
+    ) -> dict[str, TeamResult]:
+    """
+    Evaluate the teams with the repos fetched by 'fetch_team_repos' and update the benchmark timeouts of previous runs
+    The benchmarks are cpu bound subprocesses, about one team per core is run ('CONCURRENCY')
+    """
+    timeouts = load_benchmark_timeouts(temp_dir)
+    # a timeout is only skipped again with the same benchmarks, 'update_repo' may have changed them since
+    benchmark_commit = get_head_commit(master_repo)
+    team_results: dict[str, TeamResult] = {}
+    with ThreadPoolExecutor(max_workers=get_concurrency('CONCURRENCY', max(1, (os.cpu_count() or 1) - 2))) as executor:
+        futures = {
+            executor.submit(
+                evaluate_team, team, temp_dir, master_repo, checkouts[team.id],
+                recorded_timeouts(timeouts, team.repository, benchmark_commit)
+            ): team
+            for team in teams
+        }
+        for future in as_completed(futures):
+            team = futures[future]
+            try:
+                team_results[team.id] = future.result()
+            except Exception as err:  # pylint: disable=broad-exception-caught
+                # no benchmark has run, keep the timeouts recorded for the repository
+                team_results[team.id] = TeamResult(
+                    git_contributors=None,
+                    github_errors=f"Evaluation failed: {err}",
+                    completed_jira_issues=None,
+                    benchmark_results={}
+                )
+                continue
+            if team.repository is not None and checkouts[team.id].commit_id is not None:
+                timeouts[team.repository] = {
+                    game: {'commit': commit_id, 'benchmark': benchmark_commit}
+                    for game, commit_id in team_results[team.id].benchmark_timeouts.items()
+                }
+    save_benchmark_timeouts(temp_dir, {repo: games for repo, games in timeouts.items() if games})
+    return team_results
+
+
+def build_result_tables(
+    teams: list[Team],
+    team_results: dict[str, TeamResult]
+    ) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """ Build the main table and the uno and dog test overviews from the team results """
+    main_table: list[tuple[Any, ...]] = []
+    uno_table: dict[str, list[str | int | None]] = {"team_id": [], "team_name": []}
+    dog_table: dict[str, list[str | int | None]] = {"team_id": [], "team_name": []}
     for team in teams:
-        team_result = evaluate_team(team=team, temp_dir=temp_dir, master_repo=master_repo)
-        main_table.append({
-            "team_id": team.nr,
-            "team_name": team.name,
-            "repository": team.repository,
-            "contributors": team_result.git_contributors,
-            "github_errors": team_result.github_errors,
-            "jira_board": team.jira_board,
-            "completed_jira_issues": team_result.completed_jira_issues,
-            "hangman_benchmark": team_result.benchmark_results['hangman'].overall_results
-                if 'hangman' in team_result.benchmark_results else '-',
-            "battleship_benchmark": team_result.benchmark_results['battleship'].overall_results
-                if 'battleship' in team_result.benchmark_results else '-',
-            "uno_benchmark": team_result.benchmark_results['uno'].overall_results
-                if 'uno' in team_result.benchmark_results else '-',
-            "dog_benchmark": team_result.benchmark_results['dog'].overall_results
-                if 'dog' in team_result.benchmark_results else '-',
-            "hangman_score": team_result.benchmark_results['hangman'].percentage
-                if 'hangman' in team_result.benchmark_results else '-',
-            "battleship_score": team_result.benchmark_results['battleship'].percentage
-                if 'battleship' in team_result.benchmark_results else '-',
-            "uno_score": team_result.benchmark_results['uno'].percentage
-                if 'uno' in team_result.benchmark_results else '-',
-            "dog_score": team_result.benchmark_results['dog'].percentage
-                if 'dog' in team_result.benchmark_results else '-',
-            })
+        team_result = team_results[team.id]
+        benchmark_results = [team_result.benchmark_results.get(game) for game in BENCHMARK_GAMES]
+        main_table.append((
+            team.nr,
+            team.name,
+            team.repository,
+            team_result.git_contributors,
+            team_result.github_errors,
+            team.jira_board,
+            team_result.completed_jira_issues,
+            *[benchmark.overall_results if benchmark else '-' for benchmark in benchmark_results],
+            *[benchmark.percentage if benchmark else '-' for benchmark in benchmark_results],
+        ))
         if 'uno' in team_result.benchmark_results:
-            uno_tests = team_result.benchmark_results['uno'].test_results
-            if len(uno_tests) > 0:
-                uno_test_results: dict[str, str | int | None] = {"team_id": team.nr, "team_name": team.name}
-                for test in uno_tests:
-                    uno_test_results[f"{test.test_nr}: {test.test_name}"] = 1 if test.passed else 0
-                uno_table.append(uno_test_results)
+            append_test_results(uno_table, team, team_result.benchmark_results['uno'].test_results)
         if 'dog' in team_result.benchmark_results:
-            dog_tests = team_result.benchmark_results['dog'].test_results
-            if len(dog_tests) > 0:
-                dog_test_results: dict[str, str | int | None] = {"team_id": team.nr, "team_name": team.name}
-                for test in dog_tests:
-                    dog_test_results[f"{test.test_nr}: {test.test_name}"] = 1 if test.passed else 0
-                dog_table.append(dog_test_results)
-    shutil.rmtree(master_repo)
-    return pd.DataFrame(main_table), pd.DataFrame(uno_table), pd.DataFrame(dog_table)
+            append_test_results(dog_table, team, team_result.benchmark_results['dog'].test_results)
+    return (
+        pd.DataFrame.from_records(main_table, columns=MAIN_TABLE_COLUMNS),
+        pd.DataFrame(uno_table),
+        pd.DataFrame(dog_table)
+    )
+
+
+def evaluate_teams(
+    sheet_url: str,
+    temp_dir: str,
+    limit: int | None = None,
+    only: set[str] | None = None
+    ) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """ Evaluate the teams of the spreadsheet, restricted to the team nrs in 'only' and the first 'limit' teams """
+    deadline = get_deadline() # fail before fetching anything if the deadline is misconfigured
+    teams = [
+        team for team in read_team_spreadsheet(sheet_url)
+        if only is None or str(team.nr).removesuffix('.0') in only # team nrs are parsed as float by pandas
+    ][:limit]
+    master_repo = prepare_benchmark_evaluation(temp_dir=temp_dir)
+    checkouts = fetch_team_repos(teams, temp_dir, deadline)
+    team_results = evaluate_fetched_teams(teams, temp_dir, master_repo, checkouts)
+    return build_result_tables(teams, team_results)
 
 
 if __name__ == "__main__":
@@ -352,7 +703,14 @@ if __name__ == "__main__":
     tempdir = os.getenv("TEMPDIR")
     if tempdir is None:
         raise ValueError('No temporary directory provided')
-    res, uno, dog = evaluate_teams(url, tempdir)
+    team_limit = os.getenv("TEAM_LIMIT")
+    only_teams = os.getenv("ONLY_TEAMS")
+    res, uno, dog = evaluate_teams(
+        url,
+        tempdir,
+        limit=int(team_limit) if team_limit else None,
+        only={team_nr.strip() for team_nr in only_teams.split(',')} if only_teams else None
+    )
     res.to_csv('evaluation_results.csv', index=False, sep=';')
     uno.to_csv('uno_test_overview.csv', index=False, sep=';')
     dog.to_csv('dog_test_overview.csv', index=False, sep=';')